@@ -0,0 +1,167 @@
+import os
+import sys
+import json
+import time
+import math
+import cv2
+import numpy as np
+from collections import defaultdict
+
+REFERENCE_FOLDER = os.path.join(os.getcwd(), 'reference')
+ATLAS_FOLDER = os.path.join(REFERENCE_FOLDER, 'atlas')
+MANIFEST_FILE = "manifest.json"
+TILE_SIZE = 448
+HUD_CROP = False
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.webp')
+
+def load_references(ref_folder):
+    categories_path = os.path.join(ref_folder, 'categories.txt')
+    if not os.path.exists(categories_path):
+        raise FileNotFoundError("Missing categories.txt in reference folder")
+
+    category_map = {}
+    with open(categories_path, 'r') as f:
+        for line in f:
+            if ':' in line:
+                idx, name = line.strip().split(':', 1)
+                category_map[str(int(idx.strip()))] = name.strip().lower()
+
+    references = defaultdict(list)
+    for file in sorted(os.listdir(ref_folder)):
+        if file.lower().endswith(IMAGE_EXTS):
+            name = os.path.splitext(file)[0]
+            parts = name.split('-')
+            if parts[0].isdigit():
+                category_index = str(int(parts[0]))
+                if category_index in category_map:
+                    category = category_map[category_index]
+                    references[category].append(os.path.join(ref_folder, file))
+
+    return list(category_map.values()), references
+
+def crop_hud(image):
+    # same bottom-center window IO.py cuts out of each video frame
+    h, w = image.shape[:2]
+    crop_size = 896
+    top = max(h - crop_size, 0)
+    left = max((w - crop_size) // 2, 0)
+    return image[top:h, left:left + crop_size]
+
+def fit_tile(image, tile_size):
+    h, w = image.shape[:2]
+    scale = tile_size / max(h, w)
+    resized = cv2.resize(image, (max(int(w * scale), 1), max(int(h * scale), 1)), interpolation=cv2.INTER_AREA)
+    tile = np.zeros((tile_size, tile_size, 3), dtype=np.uint8)
+    rh, rw = resized.shape[:2]
+    top = (tile_size - rh) // 2
+    left = (tile_size - rw) // 2
+    tile[top:top + rh, left:left + rw] = resized
+    return tile
+
+def label_tile(tile, text):
+    font_scale = max(tile.shape[0] / 640, 0.4)
+    thickness = max(int(font_scale * 2), 1)
+    (tw, th), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+    cv2.rectangle(tile, (0, 0), (tw + 10, th + baseline + 10), (0, 0, 0), -1)
+    cv2.putText(tile, text, (5, th + 5), cv2.FONT_HERSHEY_SIMPLEX, font_scale, (255, 255, 255), thickness, cv2.LINE_AA)
+    return tile
+
+def build_atlas(category, ref_paths, tile_size=TILE_SIZE, hud_crop=HUD_CROP):
+    tiles = []
+    for i, ref_img_path in enumerate(ref_paths):
+        image = cv2.imread(ref_img_path)
+        if image is None:
+            print(f"skipping unreadable reference: {ref_img_path}")
+            continue
+        if hud_crop:
+            image = crop_hud(image)
+        tiles.append(label_tile(fit_tile(image, tile_size), f"{category} #{i + 1}"))
+
+    if not tiles:
+        return None
+
+    cols = math.ceil(math.sqrt(len(tiles)))
+    rows = math.ceil(len(tiles) / cols)
+    atlas = np.zeros((rows * tile_size, cols * tile_size, 3), dtype=np.uint8)
+    for i, tile in enumerate(tiles):
+        r, c = divmod(i, cols)
+        atlas[r * tile_size:(r + 1) * tile_size, c * tile_size:(c + 1) * tile_size] = tile
+    return atlas
+
+def reference_signature(ref_paths, tile_size, hud_crop):
+    files = []
+    for ref_img_path in ref_paths:
+        stat = os.stat(ref_img_path)
+        files.append([os.path.basename(ref_img_path), stat.st_size, stat.st_mtime_ns])
+    return {"tile_size": tile_size, "hud_crop": hud_crop, "files": files}
+
+def load_manifest(atlas_folder):
+    manifest_path = os.path.join(atlas_folder, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+def get_atlases(references, atlas_folder=ATLAS_FOLDER, max_refs=None, tile_size=None, hud_crop=None):
+    # returns {category: atlas_path}, only re-rendering atlases whose references changed
+    # settings left as None fall back to whatever the last build used, then to the defaults
+    os.makedirs(atlas_folder, exist_ok=True)
+    manifest = load_manifest(atlas_folder)
+    settings = manifest.get("settings", {})
+    if tile_size is None:
+        tile_size = settings.get("tile_size", TILE_SIZE)
+    if hud_crop is None:
+        hud_crop = settings.get("hud_crop", HUD_CROP)
+    atlases = {}
+    changed = settings != {"tile_size": tile_size, "hud_crop": hud_crop}
+    manifest["settings"] = {"tile_size": tile_size, "hud_crop": hud_crop}
+
+    for category, ref_paths in references.items():
+        ref_paths = sorted(ref_paths)
+        ref_paths = ref_paths[:max_refs] if max_refs else ref_paths
+        key = f"{category}_{len(ref_paths)}"
+        atlas_path = os.path.join(atlas_folder, f"{key}.jpg")
+        signature = reference_signature(ref_paths, tile_size, hud_crop)
+
+        if manifest.get(key) == signature and os.path.exists(atlas_path):
+            atlases[category] = atlas_path
+            continue
+
+        atlas = build_atlas(category, ref_paths, tile_size, hud_crop)
+        if atlas is None:
+            continue
+        cv2.imwrite(atlas_path, atlas)
+        manifest[key] = signature
+        atlases[category] = atlas_path
+        changed = True
+        print(f"built atlas: {os.path.basename(atlas_path)} ({len(ref_paths)} refs)")
+
+    if changed:
+        with open(os.path.join(atlas_folder, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    return atlases
+
+def clear_atlases(atlas_folder=ATLAS_FOLDER):
+    if not os.path.exists(atlas_folder):
+        print("atlas folder does not exist")
+        return
+    for file in os.listdir(atlas_folder):
+        os.remove(os.path.join(atlas_folder, file))
+    os.rmdir(atlas_folder)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1].lower() == 'clear':
+        clear_atlases()
+        print("atlas folder cleared")
+    else:
+        # python atlas.py [tile_size] [hud] - vidsort/vidsort_refine reuse these settings
+        tile_size = int(sys.argv[1]) if len(sys.argv) > 1 else TILE_SIZE
+        hud_crop = len(sys.argv) > 2 and sys.argv[2].lower() == 'hud'
+        start_time = time.time()
+        _, references = load_references(REFERENCE_FOLDER)
+        atlases = get_atlases(references, tile_size=tile_size, hud_crop=hud_crop)
+        print(f"{len(atlases)} atlases ready in {ATLAS_FOLDER} ({time.time() - start_time:.2f} seconds)")
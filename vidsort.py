@@ -6,8 +6,10 @@ import lmstudio as lms
 import re
 from collections import defaultdict
 from tqdm import tqdm
+from atlas import get_atlases
 
 threshold = 5
+USE_ATLAS = False
 
 REFERENCE_FOLDER = os.path.join(os.getcwd(), 'reference')
 INPUT_FOLDER = os.path.join(os.getcwd(), 'input')
@@ -27,7 +29,7 @@ def load_categories_and_references(ref_folder):
                 category_map[str(int(idx.strip()))] = name.strip().lower()
 
     references = defaultdict(list)
-    for file in os.listdir(ref_folder):
+    for file in sorted(os.listdir(ref_folder)):
         if file.lower().endswith(('.png', '.jpg', '.jpeg', '.webp')):
             name = os.path.splitext(file)[0]
             parts = name.split('-')
@@ -70,11 +72,18 @@ def classify_group(model, filenames, references, cached_refs, progress):
             num_refs = 0
             for ref_img_path in ref_paths:
                 ref_image = cached_refs[ref_img_path]
-                prompt = (
-                    "You will compare a reference image (one of several from a game) and an input image.\n"
-                    "Give a similarity score between 0 (not similar) and 100 (identical).\n"
-                    "Only respond with a number."
-                )
+                if USE_ATLAS:
+                    prompt = (
+                        "The first image is a labelled grid of reference screenshots from one game, the second is an input image.\n"
+                        "Give a similarity score between 0 (not from this game) and 100 (clearly from this game).\n"
+                        "Only respond with a number."
+                    )
+                else:
+                    prompt = (
+                        "You will compare a reference image (one of several from a game) and an input image.\n"
+                        "Give a similarity score between 0 (not similar) and 100 (identical).\n"
+                        "Only respond with a number."
+                    )
                 chat = lms.Chat()
                 chat.add_user_message(prompt, images=[ref_image, input_image])
                 response = model.respond(chat)
@@ -106,6 +115,11 @@ def sort_images_by_reference(model, input_folder, reference_folder, output_folde
     categories, references = load_categories_and_references(reference_folder)
     all_categories = categories + ["others"]
 
+    if USE_ATLAS:
+        # one tiled image per category, so each frame costs one call per category
+        atlases = get_atlases(references, os.path.join(reference_folder, 'atlas'))
+        references = {category: [atlas_path] for category, atlas_path in atlases.items()}
+
     cached_refs = {}
     for paths in references.values():
         for ref_img_path in paths:
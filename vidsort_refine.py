@@ -6,8 +6,10 @@ import lmstudio as lms
 import re
 from collections import defaultdict
 from tqdm import tqdm
+from atlas import get_atlases
 
 threshold = 1
+USE_ATLAS = False
 
 REFERENCE_FOLDER = os.path.join(os.getcwd(), 'reference')
 INPUT_FOLDER = os.path.join(os.getcwd(), 're')
@@ -52,7 +54,7 @@ def group_video_frames(folder):
             grouped[prefix].append(file)
     return grouped
 
-def classify_group_adaptive(model, filenames, references_by_category, cached_refs, progress):
+def classify_group_adaptive(model, filenames, references_by_category, cached_refs, progress, atlases_by_count=None):
     scores_by_cat = defaultdict(float)
     counts_by_cat = defaultdict(int)
     full_log = []
@@ -68,15 +70,26 @@ def classify_group_adaptive(model, filenames, references_by_category, cached_ref
             full_log.append(f"Classifying: {file} using {num_refs} refs\n")
 
             for category, ref_paths in references_by_category.items():
-                for ref_img_path in ref_paths[:num_refs]:
-                    ref_image = cached_refs[ref_img_path]
-
+                if atlases_by_count:
+                    # the first num_refs references tiled into one image
+                    atlas_path = atlases_by_count[num_refs].get(category)
+                    batch = [atlas_path] if atlas_path else []
+                    prompt = (
+                        "The first image is a labelled grid of reference screenshots from one game, the second is an input image.\n"
+                        "Give a similarity score between 0 (not from this game) and 100 (clearly from this game).\n"
+                        "Only respond with a number."
+                    )
+                else:
+                    batch = ref_paths[:num_refs]
                     prompt = (
                         "You will compare a reference image (from a game) and an input image.\n"
                         "Give a similarity score between 0 (not similar) and 100 (identical).\n"
                         "Only respond with a number."
                     )
 
+                for ref_img_path in batch:
+                    ref_image = cached_refs[ref_img_path]
+
                     chat = lms.Chat()
                     chat.add_user_message(prompt, images=[ref_image, input_image])
                     response = model.respond(chat)
@@ -121,10 +134,17 @@ def sort_images_adaptive(model, input_folder, reference_folder, output_folder):
     all_categories = categories + ["others"]
 
     cached_refs = {}
-    for ref_paths in references.values():
-        for ref_img_path in ref_paths:
-            if ref_img_path not in cached_refs:
-                cached_refs[ref_img_path] = lms.prepare_image(ref_img_path)
+    atlases_by_count = None
+    if USE_ATLAS:
+        atlas_folder = os.path.join(reference_folder, 'atlas')
+        max_refs = max((len(refs) for refs in references.values()), default=0)
+        atlases_by_count = {n: get_atlases(references, atlas_folder, max_refs=n) for n in range(1, max_refs + 1)}
+        ref_images = {path for atlases in atlases_by_count.values() for path in atlases.values()}
+    else:
+        ref_images = {path for ref_paths in references.values() for path in ref_paths}
+
+    for ref_img_path in ref_images:
+        cached_refs[ref_img_path] = lms.prepare_image(ref_img_path)
 
     os.makedirs(output_folder, exist_ok=True)
     for category in all_categories:
@@ -134,7 +154,7 @@ def sort_images_adaptive(model, input_folder, reference_folder, output_folder):
     progress = tqdm(total=sum(len(v)*len(references) for v in grouped.values()), desc="Adaptive Sort", unit="img", ncols=80)
 
     for prefix, frames in grouped.items():
-        category, log = classify_group_adaptive(model, frames, references, cached_refs, progress)
+        category, log = classify_group_adaptive(model, frames, references, cached_refs, progress, atlases_by_count)
 
         os.makedirs(os.path.join(output_folder, category), exist_ok=True)
         rep_frame = frames[0]